@@ -103,15 +103,17 @@ impl Cache {
     /// Get a cached httpdir.
     pub fn httpdir_get(&self, url: &Url) -> Option<Result<Vec<UrlResult>>> {
         self.get(&filename::httpdir(url)).map(|buf| {
-            let fp = File::open(buf)?;
+            let fp = std::io::BufReader::new(File::open(buf)?);
             bincode::deserialize_from(fp).context("Failed to decode cached result")
         })
     }
 
     /// Add a httpdir to the cache.
     pub fn httpdir_add(&self, url: &Url, paths: &[UrlResult]) -> Result<()> {
-        let fp = self.create(&filename::httpdir(url))?;
-        bincode::serialize_into(fp, paths).context("Failed to serialize httpdir save")
+        // bincode writes each url separately, buffer them to avoid a syscall per value.
+        let mut fp = std::io::BufWriter::new(self.create(&filename::httpdir(url))?);
+        bincode::serialize_into(&mut fp, paths).context("Failed to serialize httpdir save")?;
+        fp.flush().context("Failed to write httpdir save")
     }
 
     /// Remove a remote file from the cache.
@@ -572,10 +572,11 @@ fn process(
 }
 
 fn process_live(env: &TargetEnv, content: &Content, model: &Model<FeaturesMatrix>) -> Result<()> {
-    let print_context = |pos: usize, xs: &[Rc<str>]| {
+    use std::fmt::Write;
+    let write_context = |out: &mut String, pos: usize, xs: &[Rc<str>]| {
         xs.iter()
             .enumerate()
-            .for_each(|(idx, line)| println!("   {} | {}", pos + idx, line))
+            .for_each(|(idx, line)| writeln!(out, "   {} | {}", pos + idx, line).unwrap())
     };
 
     let mut progress_sep_shown = false;
@@ -599,20 +600,25 @@ fn process_live(env: &TargetEnv, content: &Content, model: &Model<FeaturesMatrix
                     } else {
                         0
                     };
+                    // Format the whole anomaly first to print it with a single write.
+                    let mut out = String::new();
                     if let Some(last_pos) = last_pos {
                         if last_pos < starting_pos {
-                            println!("--");
+                            out.push_str("--\n");
                         }
                     }
 
-                    print_context(starting_pos, &anomaly.before);
-                    println!(
+                    write_context(&mut out, starting_pos, &anomaly.before);
+                    writeln!(
+                        out,
                         "{:02.0} {} | {}",
                         anomaly.anomaly.distance * 99.0,
                         anomaly.anomaly.pos,
                         anomaly.anomaly.line
-                    );
-                    print_context(anomaly.anomaly.pos, &anomaly.after);
+                    )
+                    .unwrap();
+                    write_context(&mut out, anomaly.anomaly.pos, &anomaly.after);
+                    print!("{}", out);
 
                     last_pos = Some(anomaly.anomaly.pos + anomaly.after.len());
                 };
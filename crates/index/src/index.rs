@@ -101,11 +101,11 @@ fn cosine_distance_chunk(
     result
 }
 
+/// Build a csr matrix row by row, without intermediate triplets.
 pub struct FeaturesMatrixBuilder {
-    current_row: usize,
-    row: Vec<usize>,
-    col: Vec<usize>,
-    val: Vec<f32>,
+    indptr: Vec<usize>,
+    indices: Vec<usize>,
+    data: Vec<f32>,
 }
 
 impl traits::IndexReader for FeaturesMatrix {
@@ -131,29 +131,30 @@ impl traits::IndexBuilder for FeaturesMatrixBuilder {
     type Reader = FeaturesMatrix;
 
     fn add(&mut self, line: &str) {
-        let row = self.current_row;
-        self.current_row += 1;
         let vector = vectorize(line);
         let l2_norm = vector.l2_norm();
+        // The vector indices are sorted, they can be appended as a new csr row.
         for (col, val) in vector.iter() {
-            self.row.push(row);
-            self.col.push(col);
-            self.val.push(*val / l2_norm);
+            self.indices.push(col);
+            self.data.push(*val / l2_norm);
         }
+        self.indptr.push(self.indices.len());
     }
 
     fn build(self) -> FeaturesMatrix {
-        TriMat::from_triplets((self.row.len(), SIZE), self.row, self.col, self.val).to_csr()
+        let rows = self.indptr.len() - 1;
+        CsMat::new((rows, SIZE), self.indptr, self.indices, self.data)
     }
 }
 
 impl Default for FeaturesMatrixBuilder {
     fn default() -> Self {
+        let mut indptr = Vec::with_capacity(4096);
+        indptr.push(0);
         Self {
-            current_row: 0,
-            row: Vec::with_capacity(65535),
-            col: Vec::with_capacity(65535),
-            val: Vec::with_capacity(65535),
+            indptr,
+            indices: Vec::with_capacity(65535),
+            data: Vec::with_capacity(65535),
         }
     }
 }
@@ -280,6 +281,17 @@ mod tests {
         assert_eq!(distances, expected);
     }
 
+    #[test]
+    fn test_builder() {
+        use crate::traits::*;
+        let baselines = vec!["the first line".to_string(), "the second line".to_string()];
+        let mut builder = FeaturesMatrixBuilder::default();
+        baselines.iter().for_each(|line| builder.add(line));
+        let model = builder.build();
+        assert_eq!(model.rows(), 2);
+        assert_eq!(model, index_mat(&baselines));
+    }
+
     // A test playground that was used for the search_mat implementation
     #[test]
     fn test_matrix() {
@@ -4,6 +4,7 @@
 
 /// This module provides a new vstack helper that removes removes duplicated rows.
 use sprs::*;
+use std::collections::HashMap;
 
 /// Stack the given matrices into a new one, using the most efficient stacking
 /// direction (ie vertical stack for CSR matrices, horizontal stack for CSC)
@@ -30,18 +31,30 @@ where
     let outer_dim = mats.iter().map(CsMatBase::outer_dims).sum::<usize>();
     let nnz = mats.iter().map(CsMatBase::nnz).sum::<usize>();
 
-    let mut uniques = Vec::with_capacity(outer_dim);
+    // The unique rows grouped by the hash of their indices, so that a new row
+    // is only compared with the rows that are likely equal.
+    let mut uniques: HashMap<u64, Vec<_>> = HashMap::with_capacity(outer_dim);
     let mut res = CsMatI::empty(storage_type, inner_dim);
     res.reserve_outer_dim_exact(outer_dim);
     res.reserve_nnz_exact(nnz);
     for (pos, mat) in mats.iter().enumerate() {
         for vec in mat.outer_iterator() {
-            if pos == 0 || uniques.iter().all(|v| v != &vec) {
+            let bucket = uniques.entry(hash_indices(vec.indices())).or_default();
+            if pos == 0 || bucket.iter().all(|v| v != &vec) {
                 res = res.append_outer_csvec(vec.view());
-                uniques.push(vec);
+                bucket.push(vec);
             }
         }
     }
 
     res
 }
+
+fn hash_indices<I: SpIndex>(indices: &[I]) -> u64 {
+    use std::hash::Hasher;
+    let mut hasher = fxhash::FxHasher64::default();
+    for &i in indices {
+        hasher.write_usize(i.index());
+    }
+    hasher.finish()
+}
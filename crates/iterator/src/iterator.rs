@@ -118,6 +118,10 @@ struct JsonState {
     in_string: bool,
 }
 
+// The amount of data requested per read call. A large chunk reduces the number of
+// syscalls needed to process a file, which matters when reading many small files.
+const CHUNK_SIZE: usize = 65536;
+
 /// Logline is a tuple (content, line number).
 pub type LogLine = (Bytes, usize);
 
@@ -141,7 +145,7 @@ impl<R: Read> BytesLines<R> {
     /// * `{a: b, c: {key:value}` becomes `["a: b", "c: ", "key: value"]`
     pub fn new(reader: R, split_json: bool) -> BytesLines<R> {
         // TODO: make these configurable
-        let chunk_size = 8192;
+        let chunk_size = CHUNK_SIZE;
         let max_line_length = 6000;
         let split_json = if split_json {
             Some(JsonState { in_string: false })
@@ -231,9 +235,15 @@ impl<R: Read> BytesLines<R> {
 
     // Find the next line position and update the line count
     fn find_next_line(&mut self) -> Option<(usize, Sep)> {
-        let slice = self.buf.as_ref();
-        for (pos, c) in slice[self.prev_pos..].iter().enumerate() {
-            let c = *c as char;
+        let mut pos = self.prev_pos;
+        while pos < self.buf.len() {
+            if self.split_json.is_none() && !self.escaped {
+                // Fast path: jump to the next byte that may start a separator.
+                pos += self.buf[pos..]
+                    .iter()
+                    .position(|c| *c == b'\n' || *c == b'\\')?;
+            }
+            let c = self.buf[pos] as char;
             let sep = if self.escaped {
                 self.escaped = false;
                 if c == 'n' {
@@ -256,11 +266,12 @@ impl<R: Read> BytesLines<R> {
                 // We found a separator.
                 self.update_line_counter(State::Scanning(sep));
                 let line_separator_pos = match sep {
-                    Sep::SubLine => self.prev_pos + pos - 1,
-                    _ => self.prev_pos + pos,
+                    Sep::SubLine => pos - 1,
+                    _ => pos,
                 };
                 return Some((line_separator_pos, sep));
             }
+            pos += 1;
         }
         None
     }
@@ -345,13 +356,19 @@ fn test_iterator() {
 
     let lines = get_lines("first\\n");
     assert_eq!(lines, vec![("first".into(), 1)]);
+
+    let lines = get_lines("a\\tb\\\\nc\\nd\ne");
+    assert_eq!(
+        lines,
+        vec![("a\\tb\\\\nc".into(), 1), ("d".into(), 1), ("e".into(), 2)]
+    );
 }
 
 #[test]
 fn test_long_line() {
-    let mut input = String::with_capacity(8192 * 4);
+    let mut input = String::with_capacity(CHUNK_SIZE * 4);
     // Add a single line long enough to fill two chunk buffers.
-    for _ in 0..8192 * 2 {
+    for _ in 0..CHUNK_SIZE * 2 {
         input.push('a');
     }
     input.push_str("first\n");
@@ -365,8 +382,8 @@ fn test_long_line() {
 
 #[test]
 fn test_last_line() {
-    let mut input = String::with_capacity(8192 * 3);
-    for _ in 0..8192 * 2 {
+    let mut input = String::with_capacity(CHUNK_SIZE * 3);
+    for _ in 0..CHUNK_SIZE * 2 {
         input.push('a');
     }
     input.push_str("\ntest");
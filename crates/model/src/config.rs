@@ -205,7 +205,8 @@ impl TargetConfig {
     }
 
     pub fn is_ignored_line(&self, line: &str) -> bool {
-        self.ignore_patterns.is_match(line)
+        // This is called for every line, avoid the regex engine when there are no patterns.
+        !self.ignore_patterns.is_empty() && self.ignore_patterns.is_match(line)
     }
 
     pub fn new_skip_lines(&self) -> Option<crate::unordered::KnownLines> {
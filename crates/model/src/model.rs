@@ -390,10 +390,20 @@ pub fn group_sources(
     baselines: &[Content],
 ) -> Result<HashMap<IndexName, Vec<Source>>> {
     let mut groups = HashMap::new();
+    // The baselines usually share the same layout, thus remember the index name of each path.
+    let mut index_names: HashMap<String, IndexName> = HashMap::new();
     for baseline in baselines {
         for source in content_get_sources(env, baseline)? {
+            let index_name = match index_names.get(source.get_relative()) {
+                Some(index_name) => index_name.clone(),
+                None => {
+                    let index_name = indexname_from_source(&source);
+                    index_names.insert(source.get_relative().to_string(), index_name.clone());
+                    index_name
+                }
+            };
             groups
-                .entry(indexname_from_source(&source))
+                .entry(index_name)
                 .or_insert_with(Vec::new)
                 .push(source);
         }
@@ -605,30 +615,43 @@ impl<IR: IndexReader + Serialize + serde::de::DeserializeOwned> Model<IR> {
         Model::<IR>::validate_timestamp(input)
     }
 
+    // bincode performs many small reads, buffer them to avoid going through the decoder for each value.
+    fn open(path: &Path) -> Result<impl Read> {
+        Ok(std::io::BufReader::new(flate2::read::GzDecoder::new(
+            std::fs::File::open(path).context("Can't open file")?,
+        )))
+    }
+
     pub fn check(path: &Path) -> Result<SystemTime> {
-        let mut input =
-            flate2::read::GzDecoder::new(std::fs::File::open(path).context("Can't open file")?);
+        let mut input = Model::<IR>::open(path)?;
         Model::<IR>::validate(&mut input)
     }
 
     pub fn load(path: &Path) -> Result<Model<IR>> {
         tracing::info!(path = path.to_str(), "Loading provided model");
-        let mut input =
-            flate2::read::GzDecoder::new(std::fs::File::open(path).context("Can't open file")?);
+        let mut input = Model::<IR>::open(path)?;
         Model::<IR>::validate(&mut input)?;
         bincode::deserialize_from(input).context("Can't load model")
     }
 
     pub fn save(&self, path: &Path) -> Result<()> {
         tracing::info!(path = path.to_str(), "Saving model");
-        let mut output = flate2::write::GzEncoder::new(
+        let mut output = std::io::BufWriter::new(flate2::write::GzEncoder::new(
             std::fs::File::create(path).context("Can't create file")?,
             flate2::Compression::fast(),
-        );
+        ));
         bincode::serialize_into(&mut output, MODEL_MAGIC).context("Can't save cookie")?;
         bincode::serialize_into(&mut output, &MODEL_VERSION).context("Can't save time")?;
         bincode::serialize_into(&mut output, &SystemTime::now()).context("Can't save time")?;
-        bincode::serialize_into(output, self).context("Can't save model")
+        bincode::serialize_into(&mut output, self).context("Can't save model")?;
+        // Finish explicitly so that write errors are not lost when the encoder is dropped.
+        output
+            .into_inner()
+            .map_err(|e| e.into_error())
+            .context("Can't flush model")?
+            .finish()
+            .context("Can't finish model")?;
+        Ok(())
     }
 }
 
@@ -636,15 +659,8 @@ impl<IR: IndexReader + Serialize + serde::de::DeserializeOwned> Model<IR> {
 /// This is useful when logjuicer is used to compare two files which may have different index name.
 fn lookup_or_single<'a, K: Eq + std::hash::Hash, V>(hm: &'a HashMap<K, V>, k: &K) -> Option<&'a V> {
     match hm.get(k) {
-        None => {
-            let values = hm.values().collect::<Vec<&V>>();
-            if values.len() == 1 {
-                Some(values[0])
-            } else {
-                None
-            }
-        }
-        Some(v) => Some(v),
+        None if hm.len() == 1 => hm.values().next(),
+        v => v,
     }
 }
 
@@ -4,7 +4,7 @@
 //! This module provides the core utilities to use logjuicer-index with Read objects.
 
 use anyhow::Result;
-use std::collections::VecDeque;
+use std::collections::{HashMap, HashSet, VecDeque};
 use std::io::Read;
 use std::rc::Rc;
 
@@ -21,12 +21,15 @@ const CTX_DISTANCE: usize = 3;
 const CTX_MAX_DISTANCE: usize = 12;
 // The matrix size to compute distances in batch
 const CHUNK_SIZE: usize = 512;
+// The maximum number of raw line hashes to remember
+const RAW_LINES_MAX: usize = 1 << 20;
 
 /// Helper struct to manage indexing multiples readers.
 pub struct IndexTrainer<IB: IndexBuilder> {
     builder: IB,
     is_json: bool,
     skip_lines: KnownLines,
+    raw_lines: RawLines,
     pub line_count: usize,
     pub byte_count: usize,
 }
@@ -40,6 +43,7 @@ where
             builder,
             is_json,
             skip_lines: KnownLines::new(),
+            raw_lines: RawLines::default(),
             line_count: 0,
             byte_count: 0,
         }
@@ -66,7 +70,7 @@ where
             self.line_count += 1;
             self.byte_count += line.0.len();
 
-            if config.is_ignored_line(raw_str) {
+            if config.is_ignored_line(raw_str) || !self.raw_lines.insert(raw_str) {
                 continue;
             }
 
@@ -85,6 +89,28 @@ where
     }
 }
 
+fn hash_line(line: &str) -> u64 {
+    use std::hash::{Hash, Hasher};
+    let mut hasher = std::collections::hash_map::DefaultHasher::new();
+    line.hash(&mut hasher);
+    hasher.finish()
+}
+
+/// The recently seen raw lines, to avoid tokenizing exact duplicates.
+/// The set is reset when it gets too big to bound the memory usage.
+#[derive(Default)]
+struct RawLines(HashSet<u64>);
+
+impl RawLines {
+    /// Returns false when the line was already seen.
+    fn insert(&mut self, line: &str) -> bool {
+        if self.0.len() >= RAW_LINES_MAX {
+            self.0.clear();
+        }
+        self.0.insert(hash_line(line))
+    }
+}
+
 /// Helper struct to manage the log lines and the unique tokenized lines.
 /// The goal is to perform the index search on unique lines, while keeping a
 /// buffer of the raw line to manage the surrounding context.
@@ -95,8 +121,10 @@ pub struct ChunkProcessor<'a, IR: IndexReader, R: Read> {
     buffer: Vec<(logjuicer_iterator::LogLine, usize)>,
     /// The target tokenized lines
     targets: Vec<String>,
-    /// The target positions
-    targets_coord: Vec<usize>,
+    /// The target positions, with the index of their tokenized line in targets
+    targets_coord: Vec<(usize, usize)>,
+    /// The index of the targets by tokens hash, to search duplicated lines once per chunk
+    targets_pos: HashMap<u64, usize>,
     /// The very last lines of the current buffer that could be the prev context of the next chunk
     left_overs: Vec<Rc<str>>,
     /// The current anomaly being processed
@@ -105,6 +133,8 @@ pub struct ChunkProcessor<'a, IR: IndexReader, R: Read> {
     anomalies: VecDeque<AnomalyContext>,
     /// The list of unique log lines, to avoid searching a line twice.
     skip_lines: &'a mut Option<KnownLines>,
+    /// The raw lines already seen, to skip them without tokenizing when duplicates are skipped.
+    raw_lines: RawLines,
     /// The current line coordinate.
     coord: usize,
     /// Total lines count
@@ -161,9 +191,11 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
             left_overs: Vec::new(),
             targets: Vec::with_capacity(CHUNK_SIZE),
             targets_coord: Vec::with_capacity(CHUNK_SIZE),
+            targets_pos: HashMap::new(),
             current_anomaly: None,
             anomalies: VecDeque::new(),
             skip_lines,
+            raw_lines: RawLines::default(),
             coord: 0,
             line_count: 0,
             byte_count: 0,
@@ -227,33 +259,47 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
                 continue;
             }
 
-            // Call the static method of the ChunkIndex trait
-            let tokens = logjuicer_tokenizer::process(raw_str);
+            let target_pos = match self.skip_lines {
+                // An identical raw line was already tokenized and added to the skip_lines.
+                Some(_) if !self.raw_lines.insert(raw_str) => None,
+                Some(skip_lines) => {
+                    let tokens = logjuicer_tokenizer::process(raw_str);
+                    if skip_lines.insert(&tokens) {
+                        Some(self.add_target(tokens))
+                    } else {
+                        None
+                    }
+                }
+                // When duplicates are kept, re-use the distance of the identical line
+                // already present in this chunk.
+                None => {
+                    let tokens = logjuicer_tokenizer::process(raw_str);
+                    let hash = hash_line(&tokens);
+                    match self.targets_pos.get(&hash) {
+                        Some(pos) if self.targets[*pos] == tokens => Some(*pos),
+                        // Hash collision, search the line on its own
+                        Some(_) => Some(self.add_target(tokens)),
+                        None => {
+                            let pos = self.add_target(tokens);
+                            self.targets_pos.insert(hash, pos);
+                            Some(pos)
+                        }
+                    }
+                }
+            };
 
             // Keep in the buffer all the lines until we get CHUNK_SIZE unique lines
             self.buffer.push((line, self.coord));
 
-            let process_line = if let Some(skip_lines) = self.skip_lines {
-                skip_lines.insert(&tokens)
-            } else {
-                // TODO: this is not great because we are re-computing the same distance,
-                // instead we should keep a record and re-use known value.
-                // though, it's probably a lot of work...
-                true
-            };
-
-            if process_line {
-                self.targets.push(tokens);
-                self.targets_coord.push(self.coord);
+            if let Some(pos) = target_pos {
+                self.targets_coord.push((self.coord, pos));
+            }
 
-                if self.targets.len() == CHUNK_SIZE {
-                    self.do_search_anomalies();
-                    if !self.anomalies.is_empty() {
-                        return Ok(());
-                    }
-                }
-            } else if self.buffer.len() > CHUNK_SIZE * 10 {
-                // the source contains mostly duplicate line.
+            // Search the chunk when it contains enough lines to process,
+            // or when the source contains mostly duplicate line.
+            // Note that when duplicates are kept, the chunk size is based on the number of lines,
+            // not the number of unique targets, so that the chunk boundaries do not change.
+            if self.targets_coord.len() == CHUNK_SIZE || self.buffer.len() > CHUNK_SIZE * 10 {
                 self.do_search_anomalies();
                 if !self.anomalies.is_empty() {
                     return Ok(());
@@ -265,26 +311,43 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
         if !self.targets.is_empty() {
             self.do_search_anomalies();
         }
-        if let Some(anomaly) = &self.current_anomaly {
+        if let Some(anomaly) = self.current_anomaly.take() {
             // No more after context available
-            self.anomalies.push_back(anomaly.clone());
-            self.current_anomaly = None;
+            self.anomalies.push_back(anomaly);
         }
         Ok(())
     }
 
+    // Add a new tokenized line to be searched and returns its index.
+    fn add_target(&mut self, tokens: String) -> usize {
+        self.targets.push(tokens);
+        self.targets.len() - 1
+    }
+
     /// Helper function for the anomalies_from_reader implementation.
     fn do_search_anomalies(&mut self) {
         let distances = self.index.distance(&self.targets);
 
+        if self.current_anomaly.is_none() && distances.iter().all(|d| d <= &THRESHOLD) {
+            // Most chunks do not contain anomaly, in that case there is no need to walk the buffer.
+            return self.reset(0);
+        }
+
         let mut buffer_pos = 0;
         let mut last_context_pos = 0;
 
-        for (distance, coord) in distances.iter().zip(self.targets_coord.iter()) {
+        for (coord, target_pos) in self.targets_coord.iter() {
+            let distance = &distances[*target_pos];
             let is_anomaly = distance > &THRESHOLD;
 
             // The distances and coords are out of sync with the buffer, because they only contains unique line.
             // Thus for each distance, we need to find the matching raw lines in the buffer.
+            if self.current_anomaly.is_none() {
+                // The lines before the target are not needed for an after context,
+                // so we can jump to the target using the ordered buffer coordinates.
+                buffer_pos +=
+                    self.buffer[buffer_pos..].partition_point(|(_, line_coord)| line_coord < coord);
+            }
             let mut target_str = None;
             let buffer = &self.buffer[buffer_pos..];
             for ((bytes, line_number), line_coord) in buffer {
@@ -301,9 +364,8 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
                     let raw_str = logjuicer_iterator::clone_bytes_to_string(bytes).unwrap();
                     anomaly.after.push(raw_str);
                     if anomaly.after.len() >= CTX_DISTANCE {
-                        // The current anomaly is completed. TODO: try using std::mem::replace
-                        self.anomalies.push_back(anomaly.clone());
-                        self.current_anomaly = None;
+                        // The current anomaly is completed, move it to the result queue.
+                        self.anomalies.extend(self.current_anomaly.take());
                     }
                     // And we update the last context pos to adjust the next anomaly before context.
                     last_context_pos = buffer_pos;
@@ -314,10 +376,9 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
             }
 
             if let Some((log_line, log_pos)) = target_str {
-                if let Some(anomaly) = &self.current_anomaly {
+                if let Some(anomaly) = self.current_anomaly.take() {
                     // We can push the current anomaly because any needed after context would overlap with the current anomaly.
-                    self.anomalies.push_back(anomaly.clone());
-                    self.current_anomaly = None;
+                    self.anomalies.push_back(anomaly);
                 }
 
                 // Parse timestamp from current line
@@ -363,9 +424,8 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
                     let raw_str = logjuicer_iterator::clone_bytes_to_string(bytes).unwrap();
                     anomaly.after.push(raw_str);
                     if anomaly.after.len() >= CTX_DISTANCE {
-                        // The current anomaly is completed. TODO: try using std::mem::replace
-                        self.anomalies.push_back(anomaly.clone());
-                        self.current_anomaly = None;
+                        // The current anomaly is completed, move it to the result queue.
+                        self.anomalies.extend(self.current_anomaly.take());
                         break;
                     }
                 }
@@ -377,6 +437,7 @@ impl<'a, IR: IndexReader, R: Read> ChunkProcessor<'a, IR, R> {
     fn reset(&mut self, left_overs_pos: usize) {
         self.targets.clear();
         self.targets_coord.clear();
+        self.targets_pos.clear();
 
         // Keep the buffer left over as potential prev context for the next anomaly.
         let min_left_overs_pos = if self.buffer.len() < CTX_MAX_DISTANCE {
@@ -685,3 +746,96 @@ ignore_patterns:
     let anomalies = processor.into_iter().collect::<Vec<_>>();
     assert_eq!(anomalies.len(), 1);
 }
+
+#[test]
+fn test_keep_duplicate() {
+    let config = &TargetConfig::default();
+    let baseline = std::io::Cursor::new("001: regular log line");
+
+    let mut trainer = IndexTrainer::new(logjuicer_index::FeaturesMatrixBuilder::default(), false);
+    trainer.add(config, baseline).unwrap();
+    let index = trainer.build();
+
+    let data = std::io::Cursor::new(
+        [
+            "001: regular log line",
+            "Traceback oops",
+            "002: regular log line",
+            "003: regular log line",
+            "004: regular log line",
+            "005: regular log line",
+            "Traceback oops",
+            "006: regular log line",
+        ]
+        .join("\n"),
+    );
+    let mut skip_lines = None;
+    let processor = ChunkProcessor::new(data, &index, false, false, &mut skip_lines, config, None);
+    let anomalies = processor.map(|a| a.unwrap()).collect::<Vec<_>>();
+    assert_eq!(
+        anomalies.iter().map(|a| a.anomaly.pos).collect::<Vec<_>>(),
+        vec![2, 7]
+    );
+    assert_eq!(anomalies[1].after, vec!["006: regular log line".into()]);
+}
+
+#[test]
+fn test_keep_duplicate_chunks() {
+    let config = &TargetConfig::default();
+    let baseline = std::io::Cursor::new("regular log line");
+
+    let mut trainer = IndexTrainer::new(logjuicer_index::FeaturesMatrixBuilder::default(), false);
+    trainer.add(config, baseline).unwrap();
+    let index = trainer.build();
+
+    // The anomaly is right after the first chunk, it gets the extended before context from the left overs.
+    let lines = (1..=CHUNK_SIZE + 4)
+        .map(|pos| match pos {
+            pos if pos == CHUNK_SIZE + 2 => "Traceback oops",
+            _ => "regular log line",
+        })
+        .collect::<Vec<_>>();
+    let data = std::io::Cursor::new(lines.join("\n"));
+    let mut skip_lines = None;
+    let processor = ChunkProcessor::new(data, &index, false, false, &mut skip_lines, config, None);
+    let anomalies = processor.map(|a| a.unwrap()).collect::<Vec<_>>();
+    assert_eq!(
+        anomalies.iter().map(|a| a.anomaly.pos).collect::<Vec<_>>(),
+        vec![CHUNK_SIZE + 2]
+    );
+    assert_eq!(anomalies[0].before.len(), CTX_MAX_DISTANCE);
+}
+
+#[test]
+fn test_many_chunks() {
+    let config = &TargetConfig::default();
+    let baseline = std::io::Cursor::new("regular log line");
+
+    let mut trainer = IndexTrainer::new(logjuicer_index::FeaturesMatrixBuilder::default(), false);
+    trainer.add(config, baseline).unwrap();
+    let index = trainer.build();
+
+    // Create enough lines to fill multiple chunks, with anomalies around the chunk boundary.
+    let lines = (1..=CHUNK_SIZE * 12)
+        .map(|pos| match pos {
+            42 => "Traceback alpha",
+            5119 => "Traceback bravo",
+            5125 => "Traceback charlie",
+            6000 => "Traceback delta",
+            _ => "regular log line",
+        })
+        .collect::<Vec<_>>();
+    let data = std::io::Cursor::new(lines.join("\n"));
+    let mut skip_lines = Some(KnownLines::new());
+    let processor = ChunkProcessor::new(data, &index, false, false, &mut skip_lines, config, None);
+    let anomalies = processor.map(|a| a.unwrap()).collect::<Vec<_>>();
+    assert_eq!(
+        anomalies.iter().map(|a| a.anomaly.pos).collect::<Vec<_>>(),
+        vec![42, 5119, 5125, 6000]
+    );
+    let contexts = anomalies
+        .iter()
+        .map(|a| (a.before.len(), a.after.len()))
+        .collect::<Vec<_>>();
+    assert_eq!(contexts, vec![(3, 3), (3, 3), (2, 3), (3, 3)]);
+}
@@ -48,7 +48,8 @@ type UreqReader = Box<dyn Read + Send + Sync + 'static>;
 pub fn from_path(path: &Path) -> Result<DecompressReader> {
     let fp = File::open(path)?;
     let extension = path.extension().unwrap_or_else(|| std::ffi::OsStr::new(""));
-    Ok(if extension == ".gz" {
+    // Path::extension does not include the dot
+    Ok(if extension == "gz" {
         Gz(GzDecoder::new(fp))
     } else {
         Flat(fp)
@@ -112,6 +113,26 @@ impl Read for DecompressReader {
     }
 }
 
+#[test]
+fn test_from_path_gz() {
+    use std::io::Write;
+    let dir = tempfile::tempdir().expect("tmpdir");
+    let path = dir.path().join("job-output.txt.gz");
+    let mut encoder = flate2::write::GzEncoder::new(
+        File::create(&path).expect("create"),
+        flate2::Compression::fast(),
+    );
+    encoder.write_all(b"log line\n").expect("write");
+    encoder.finish().expect("finish");
+
+    let mut content = String::new();
+    from_path(&path)
+        .expect("open")
+        .read_to_string(&mut content)
+        .expect("read");
+    assert_eq!(content, "log line\n");
+}
+
 /*
 // Automatic decompressor implementation poc
 pub fn auto<R: Read + 'static>(mut reader: R) -> Result<Box<dyn Read>> {
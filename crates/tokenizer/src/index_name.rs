@@ -79,7 +79,7 @@ fn test_get_parent() {
     assert_eq!(get_parent_name(Path::new("log")), None);
 }
 
-fn remove_uid(base: &str) -> String {
+fn remove_uid(base: &str) -> std::borrow::Cow<'_, str> {
     use regex::Regex;
     lazy_static::lazy_static! {
         // ignore components that are 64 char long
@@ -90,7 +90,7 @@ fn remove_uid(base: &str) -> String {
             r"|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
             r")")).unwrap();
     }
-    UID.replace_all(base, "UID").to_string()
+    UID.replace_all(base, "UID")
 }
 
 #[test]
@@ -104,9 +104,7 @@ fn test_uid_remove() {
 fn remove_non_vowel_component(name: &str) -> String {
     name.split_inclusive(&['-', '_', '.'])
         .filter(|component| !is_hexadecimal(component) && contains_vowel(component))
-        .collect::<Vec<&str>>()
-        .join("")
-        .to_string()
+        .collect()
 }
 
 #[test]
@@ -147,7 +145,7 @@ impl IndexName {
     /// Creates IndexName from a path.
     pub fn from_path(base: &str) -> IndexName {
         let base_no_id = remove_uid(base);
-        let path = Path::new(&base_no_id);
+        let path = Path::new(&*base_no_id);
         let filename: &str = path
             .file_name()
             .and_then(|os_str| os_str.to_str())
@@ -102,11 +102,15 @@ fn test_global_filter() {
 }
 
 /// Replace numbers sequences with `N`.
-fn remove_numbers(word: &str) -> String {
+fn remove_numbers(word: &str) -> std::borrow::Cow<'_, str> {
     lazy_static! {
         static ref RE: Regex = Regex::new("([0-9]+\\.[0-9]+)|([0-9]+)").unwrap();
     }
-    RE.replace_all(word, "N").to_string()
+    if word.bytes().any(|c| c.is_ascii_digit()) {
+        RE.replace_all(word, "N")
+    } else {
+        word.into()
+    }
 }
 #[test]
 fn test_remove_numbers() {
@@ -124,7 +128,8 @@ fn is_date(word: &str) -> bool {
         ))
         .unwrap();
     }
-    RE.is_match(word)
+    // The shortest day/month name is `may`, the longest are `wednesday` and `september`.
+    (3..=9).contains(&word.len()) && RE.is_match(word)
 }
 #[test]
 fn test_is_date() {
@@ -148,7 +153,7 @@ fn is_error(word: &str) -> bool {
         ))
         .unwrap();
     }
-    RE.is_match(word)
+    (3..=9).contains(&word.len()) && RE.is_match(word)
 }
 
 /// Check if a word contains weird char, likely in generated id.
@@ -215,7 +220,7 @@ fn is_uuid(word: &str) -> bool {
         ))
         .unwrap();
     }
-    RE.is_match(word)
+    word.ends_with('-') && RE.is_match(word)
 }
 
 /// 3 dash separator
@@ -3,7 +3,9 @@
 
 //! This module contains the database logic.
 
+use sqlx::sqlite::{SqliteConnectOptions, SqliteJournalMode, SqlitePoolOptions};
 use sqlx::types::chrono::Utc;
+use std::str::FromStr;
 use std::sync::{
     atomic::{AtomicUsize, Ordering},
     Arc,
@@ -26,12 +28,24 @@ pub struct Db {
 }
 
 const MODEL_VER: i64 = MODEL_VERSION as i64;
+// The connections reserved for the api handlers, each report worker gets one more on top of that.
+const DB_API_CONNECTIONS: u32 = 8;
 static JANITOR: Semaphore = Semaphore::const_new(1);
 
 impl Db {
-    pub async fn new(storage_dir: &str, sizes: Arc<AtomicUsize>) -> sqlx::Result<Db> {
+    pub async fn new(
+        storage_dir: &str,
+        sizes: Arc<AtomicUsize>,
+        workers_count: usize,
+    ) -> sqlx::Result<Db> {
         let db_url = format!("sqlite://{storage_dir}/logjuicer.sqlite?mode=rwc");
-        let pool = sqlx::SqlitePool::connect(&db_url).await?;
+        // Use the write-ahead log so that the api reads are not blocked by the workers writes.
+        let options = SqliteConnectOptions::from_str(&db_url)?.journal_mode(SqliteJournalMode::Wal);
+        let workers_count = u32::try_from(workers_count).unwrap_or(u32::MAX);
+        let pool = SqlitePoolOptions::new()
+            .max_connections(DB_API_CONNECTIONS.saturating_add(workers_count))
+            .connect_with(options)
+            .await?;
         sqlx::migrate!("./migrations").run(&pool).await?;
         let db = Db { pool, sizes };
         db.clean_pending().await?;
@@ -88,6 +102,14 @@ impl Db {
             .map(|_| ())
     }
 
+    #[cfg(test)]
+    pub async fn increase_model_age(&self) -> sqlx::Result<()> {
+        sqlx::query!("update models set created_at = '2024-01-01'")
+            .execute(&self.pool)
+            .await
+            .map(|_| ())
+    }
+
     pub async fn reclaim_space(
         &self,
         storage_dir: &str,
@@ -124,52 +146,67 @@ impl Db {
         while amount > 0 {
             // remove models
             let models = sqlx::query!(
-                "SELECT content_id, bytes_size FROM models WHERE created_at < ? ORDER BY created_at ASC LIMIT 20",
+                "SELECT content_id, bytes_size FROM models WHERE created_at < ? ORDER BY created_at ASC, rowid ASC LIMIT 20",
                 last_week_str
             )
             .fetch_all(&self.pool)
             .await?;
             let has_models = !models.is_empty();
+            let mut removed: i64 = 0;
             for row in models {
-                crate::models::delete_model(storage_dir, &(row.content_id.clone().into()));
+                crate::models::delete_model(storage_dir, &(row.content_id.into()));
                 let model_size = row.bytes_size.unwrap_or(0) as usize;
                 self.sub_sizes(model_size);
                 amount = amount.saturating_sub(model_size);
                 model_count += 1;
-                sqlx::query!("delete from models where content_id != ?", row.content_id)
-                    .execute(&self.pool)
-                    .await
-                    .map(|_| ())?;
+                removed += 1;
                 if amount == 0 {
                     break;
                 }
             }
+            if removed > 0 {
+                // Delete the removed rows at once, they are the first ones of the previous query.
+                sqlx::query!(
+                    "DELETE FROM models WHERE rowid IN (SELECT rowid FROM models WHERE created_at < ? ORDER BY created_at ASC, rowid ASC LIMIT ?)",
+                    last_week_str,
+                    removed
+                )
+                .execute(&self.pool)
+                .await?;
+            }
             if amount == 0 {
                 break;
             }
 
             // remove reports
             let reports = sqlx::query!(
-                "SELECT id, bytes_size FROM reports WHERE created_at < ? ORDER BY created_at ASC LIMIT 20",
+                "SELECT id, bytes_size FROM reports WHERE created_at < ? ORDER BY created_at ASC, id ASC LIMIT 20",
                 last_week_str
             )
             .fetch_all(&self.pool)
             .await?;
             let has_reports = !reports.is_empty();
+            let mut removed: i64 = 0;
             for row in reports {
                 let report_size = row.bytes_size.unwrap_or(0) as usize;
                 self.sub_sizes(report_size);
                 amount = amount.saturating_sub(report_size);
                 report_count += 1;
+                removed += 1;
                 let _ = std::fs::remove_file(report_path(storage_dir, ReportID(row.id)));
-                sqlx::query!("delete from reports where id != ?", row.id)
-                    .execute(&self.pool)
-                    .await
-                    .map(|_| ())?;
                 if amount == 0 {
                     break;
                 }
             }
+            if removed > 0 {
+                sqlx::query!(
+                    "DELETE FROM reports WHERE id IN (SELECT id FROM reports WHERE created_at < ? ORDER BY created_at ASC, id ASC LIMIT ?)",
+                    last_week_str,
+                    removed
+                )
+                .execute(&self.pool)
+                .await?;
+            }
 
             if !has_reports && !has_models {
                 break;
@@ -199,10 +236,19 @@ impl Db {
             .map(|_| ())
     }
 
-    pub async fn get_reports(&self) -> sqlx::Result<Vec<ReportRow>> {
+    /// List the reports, newest first. Use `before` and `limit` to fetch a single page:
+    /// the next page starts before the id of the last row returned.
+    pub async fn get_reports(
+        &self,
+        before: Option<ReportID>,
+        limit: Option<i64>,
+    ) -> sqlx::Result<Vec<ReportRow>> {
+        let before = before.map(|rid| rid.0);
         sqlx::query_as!(
         ReportRow,
-        "select id, created_at, updated_at, target, baseline, anomaly_count, status, bytes_size from reports order by id desc"
+        "select id, created_at, updated_at, target, baseline, anomaly_count, status, bytes_size from reports where (?1 is null or id < ?1) order by id desc limit coalesce(?2, -1)",
+        before,
+        limit
     )
         .fetch_all(&self.pool)
         .await
@@ -15,6 +15,9 @@ use logjuicer_report::report_row::{ReportID, ReportRow, ReportStatus};
 use crate::database::report_path;
 use crate::worker::Workers;
 
+// The read size when streaming a report file
+const REPORT_CHUNK_SIZE: usize = 64 * 1024;
+
 type Error = (StatusCode, String);
 type Result<T> = std::result::Result<T, Error>;
 
@@ -26,8 +29,23 @@ fn handle_db_error(err: sqlx::Error) -> Error {
     )
 }
 
-pub async fn reports_list(State(workers): State<Workers>) -> Result<Json<Vec<ReportRow>>> {
-    let reports = workers.db.get_reports().await.map_err(handle_db_error)?;
+#[derive(Deserialize)]
+pub struct ReportsListQuery {
+    /// Only list the reports created before this one.
+    before: Option<ReportID>,
+    /// The maximum number of reports to return.
+    limit: Option<u32>,
+}
+
+pub async fn reports_list(
+    State(workers): State<Workers>,
+    Query(args): Query<ReportsListQuery>,
+) -> Result<Json<Vec<ReportRow>>> {
+    let reports = workers
+        .db
+        .get_reports(args.before, args.limit.map(i64::from))
+        .await
+        .map_err(handle_db_error)?;
     Ok(Json(reports))
 }
 
@@ -36,9 +54,32 @@ pub async fn models_list(State(workers): State<Workers>) -> Result<Json<Vec<Mode
     Ok(Json(models))
 }
 
+/// Compute a validator for a stored report file, so that clients polling a completed report
+/// can revalidate it with `If-None-Match` instead of downloading it again.
+pub(crate) fn report_etag(report_id: ReportID, metadata: &std::fs::Metadata) -> String {
+    let mtime = metadata
+        .modified()
+        .ok()
+        .and_then(|t| t.duration_since(std::time::UNIX_EPOCH).ok())
+        .map_or(0, |d| d.as_nanos());
+    format!("\"{}-{:x}-{:x}\"", report_id, metadata.len(), mtime)
+}
+
+/// Check if the `If-None-Match` headers contain the etag, using the weak comparison.
+pub(crate) fn etag_matches(headers: &axum::http::HeaderMap, etag: &str) -> bool {
+    headers
+        .get_all(axum::http::header::IF_NONE_MATCH)
+        .iter()
+        .filter_map(|value| value.to_str().ok())
+        .flat_map(|value| value.split(','))
+        .map(str::trim)
+        .any(|tag| tag == "*" || tag.strip_prefix("W/").unwrap_or(tag) == etag)
+}
+
 pub async fn report_get(
     State(workers): State<Workers>,
     Path(report_id): Path<ReportID>,
+    headers: axum::http::HeaderMap,
 ) -> Result<axum::response::Response> {
     if let Some((status, baseline)) = workers
         .db
@@ -58,14 +99,37 @@ pub async fn report_get(
             ReportStatus::Completed => {
                 let fp = report_path(&workers.storage_dir, report_id);
                 if let Ok(file) = File::open(&fp).await {
-                    // The file exists, stream its content...
+                    // The file exists, check if the client already has it...
+                    let etag = match file.metadata().await {
+                        Ok(metadata) => Some(report_etag(report_id, &metadata)),
+                        Err(_) => None,
+                    };
+                    if let Some(etag) = &etag {
+                        if etag_matches(&headers, etag) {
+                            return Ok(axum::response::Response::builder()
+                                .status(StatusCode::NOT_MODIFIED)
+                                .header(axum::http::header::ETAG, etag)
+                                .header(axum::http::header::CACHE_CONTROL, "no-cache")
+                                .body(axum::body::Body::empty())
+                                .unwrap());
+                        }
+                    }
+
+                    // ... otherwise stream its content.
 
-                    // Wrap to a tokio_util::io::ReaderStream
-                    let reader_stream = tokio_util::io::ReaderStream::new(file);
+                    // Wrap to a tokio_util::io::ReaderStream, using bigger chunks than the 4KiB default
+                    // to reduce the number of reads and body frames for large reports.
+                    let reader_stream =
+                        tokio_util::io::ReaderStream::with_capacity(file, REPORT_CHUNK_SIZE);
 
-                    Ok(axum::response::Response::builder()
+                    let mut response = axum::response::Response::builder()
                         .header("Content-Encoding", "gzip")
                         .header("x-baselines", &baseline)
+                        .header(axum::http::header::CACHE_CONTROL, "no-cache");
+                    if let Some(etag) = etag {
+                        response = response.header(axum::http::header::ETAG, etag);
+                    }
+                    Ok(response
                         .body(axum::body::Body::from_stream(reader_stream))
                         .unwrap())
                 } else {
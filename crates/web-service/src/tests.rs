@@ -3,6 +3,8 @@
 
 use logjuicer_model::env::EnvConfig;
 use logjuicer_model::{config::DiskSizeLimit, env::Env, Model};
+use logjuicer_report::model_row::ContentID;
+use logjuicer_report::report_row::FileSize;
 use logjuicer_report::{Content, Report, ZuulBuild};
 use mockito::Server;
 use std::sync::atomic::Ordering;
@@ -176,8 +178,31 @@ Second good line
     assert!(!model_path.exists());
     assert_eq!(workers.db.get_models().await.unwrap().len(), 0);
 
+    // Check reports pagination
+    let reports = workers.db.get_reports(None, None).await.unwrap();
+    assert_eq!(reports.len(), 2);
+    assert!(reports[0].id > reports[1].id);
+    let page = workers.db.get_reports(None, Some(1)).await.unwrap();
+    assert_eq!(page.len(), 1);
+    assert_eq!(page[0].id, reports[0].id);
+    let page = workers.db.get_reports(None, Some(5)).await.unwrap();
+    assert_eq!(page.len(), 2);
+    let page = workers
+        .db
+        .get_reports(Some(reports[0].id), Some(1))
+        .await
+        .unwrap();
+    assert_eq!(page.len(), 1);
+    assert_eq!(page[0].id, reports[1].id);
+    let page = workers
+        .db
+        .get_reports(Some(reports[1].id), None)
+        .await
+        .unwrap();
+    assert!(page.is_empty());
+
     // Check reclaim space
-    let reports = workers.db.get_reports().await.unwrap();
+    let reports = workers.db.get_reports(None, None).await.unwrap();
     let report_size = reports[0].bytes_size.0 as usize;
     workers.db.increase_report_age().await.unwrap();
     let (amount, model_count, report_count) = workers
@@ -195,6 +220,35 @@ Second good line
     assert!(amount > 0);
     assert_eq!(model_count, 0);
     assert_eq!(report_count, 1);
+    // Check that only the reclaimed report got removed
+    assert_eq!(workers.db.get_reports(None, None).await.unwrap().len(), 1);
+}
+
+#[tokio::test]
+async fn test_reclaim_space_models() {
+    let tempdir = tempfile::tempdir().expect("tempdir");
+    let temppath = tempdir.path().to_str().unwrap();
+    let sizes = std::sync::Arc::new(std::sync::atomic::AtomicUsize::new(0));
+    let db = crate::database::Db::new(temppath, sizes, 1).await.unwrap();
+    for content_id in ["model-a", "model-b", "model-c"] {
+        db.add_model(&ContentID(content_id.into()), FileSize(10))
+            .await
+            .unwrap();
+    }
+    db.increase_model_age().await.unwrap();
+
+    // Reclaim the size of a single model
+    let (amount, model_count, report_count) = db
+        .reclaim_space(temppath, DiskSizeLimit { min: 20, max: 25 })
+        .await
+        .unwrap()
+        .unwrap();
+    assert_eq!(amount, 10);
+    assert_eq!(model_count, 1);
+    assert_eq!(report_count, 0);
+
+    // Check that only the reclaimed model got removed
+    assert_eq!(db.get_models().await.unwrap().len(), 2);
 }
 
 #[tokio::test]
@@ -262,3 +316,44 @@ Oops this is an error
     // dbg!(&report);
     assert_eq!(report.total_anomaly_count, 0);
 }
+
+#[test]
+fn test_report_etag() {
+    use crate::routes::{etag_matches, report_etag};
+    use axum::http::{header::IF_NONE_MATCH, HeaderMap, HeaderValue};
+    use logjuicer_report::report_row::ReportID;
+
+    let tempdir = tempfile::tempdir().expect("tempdir");
+    let path = tempdir.path().join("42.gz");
+    std::fs::write(&path, "report").unwrap();
+    let etag = report_etag(ReportID(42), &std::fs::metadata(&path).unwrap());
+    assert!(etag.starts_with("\"42-") && etag.ends_with('"'));
+    assert_eq!(
+        etag,
+        report_etag(ReportID(42), &std::fs::metadata(&path).unwrap())
+    );
+    assert_ne!(
+        etag,
+        report_etag(ReportID(43), &std::fs::metadata(&path).unwrap())
+    );
+    std::fs::write(&path, "updated report").unwrap();
+    assert_ne!(
+        etag,
+        report_etag(ReportID(42), &std::fs::metadata(&path).unwrap())
+    );
+
+    let if_none_match = |value: &str| {
+        let mut headers = HeaderMap::new();
+        headers.insert(IF_NONE_MATCH, HeaderValue::from_str(value).unwrap());
+        headers
+    };
+    assert!(!etag_matches(&HeaderMap::new(), &etag));
+    assert!(etag_matches(&if_none_match(&etag), &etag));
+    assert!(etag_matches(&if_none_match(&format!("W/{etag}")), &etag));
+    assert!(etag_matches(
+        &if_none_match(&format!("\"other\", {etag}")),
+        &etag
+    ));
+    assert!(etag_matches(&if_none_match("*"), &etag));
+    assert!(!etag_matches(&if_none_match("\"other\""), &etag));
+}
@@ -48,6 +48,24 @@ pub struct Workers {
 
 const MAX_LOGJUICER_PROCESS: usize = 2;
 
+/// The number of reports that can be processed concurrently, set by the LOGJUICER_MAX_PROCESS environment.
+fn max_logjuicer_process() -> usize {
+    let value = match std::env::var("LOGJUICER_MAX_PROCESS") {
+        Err(std::env::VarError::NotPresent) => return MAX_LOGJUICER_PROCESS,
+        Err(std::env::VarError::NotUnicode(value)) => format!("{:?}", value),
+        Ok(value) => match value.parse() {
+            Ok(count) if count > 0 => return count,
+            _ => value,
+        },
+    };
+    tracing::warn!(
+        value,
+        default = MAX_LOGJUICER_PROCESS,
+        "Invalid LOGJUICER_MAX_PROCESS, using the default"
+    );
+    MAX_LOGJUICER_PROCESS
+}
+
 impl Workers {
     pub async fn new(
         allow_any_sources: bool,
@@ -58,13 +76,14 @@ impl Workers {
         let current_files_size = Arc::new(AtomicUsize::new(0));
         std::fs::create_dir_all(format!("{storage_dir}/models")).unwrap();
         // TODO: migrate reports to a reports sub directory
-        let db = Db::new(&storage_dir, current_files_size.clone())
+        let max_process = max_logjuicer_process();
+        let db = Db::new(&storage_dir, current_files_size.clone(), max_process)
             .await
             .unwrap();
         Workers {
             allow_any_sources,
             db,
-            pool: threadpool::ThreadPool::new(MAX_LOGJUICER_PROCESS),
+            pool: threadpool::ThreadPool::new(max_process),
             env: Arc::new(env),
             reports: Arc::new(RwLock::new(BTreeMap::new())),
             models: Arc::new(RwLock::new(BTreeMap::new())),